@@ -21,7 +21,6 @@ import datetime as dt
 from pathlib import Path
 from typing import List
 
-import pandas as pd
 from dotenv import load_dotenv
 
 from sepa_trade.data_fetcher import get_daily, to_weekly
@@ -32,6 +31,7 @@ from sepa_trade.strategy.vcp_breakout import VCPStrategy
 from sepa_trade.strategy.exit_rules import ExitStrategy
 from sepa_trade.live.trade_manager import TradeManager, OrderInfo
 from sepa_trade.utils.notifier import SNSNotifier, SignalMessage
+from sepa_trade.utils.tickers import load_tickers
 
 # ─────────────────────────────────────────────
 # 定数（公式下限で統一）
@@ -56,16 +56,6 @@ def parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
-def load_tickers(path: Path) -> List[str]:
-    return (
-        pd.read_csv(path, header=None)
-        .iloc[:, 0]
-        .astype(str)
-        .str.upper()
-        .tolist()
-    )
-
-
 # ─────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────
@@ -15,13 +15,14 @@ import logging
 import argparse
 import multiprocessing as mp
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
 import pandas as pd
 import yfinance as yf
 from backtesting import Backtest
 
 from scripts.backtest_vcp import VCPBacktestStrategy
+from sepa_trade.utils.tickers import load_tickers
 
 # ───────────────────────────────────────────
 #  ヘルパ
@@ -34,17 +35,6 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--processes", type=int, default=4)
     return p.parse_args()
 
-def load_tickers(path: Path) -> List[str]:
-    """Loads tickers from a single-column CSV file."""
-    return (
-        pd.read_csv(path, header=None)
-        .iloc[:, 0]
-        .astype(str)
-        .str.strip()
-        .str.upper()
-        .tolist()
-    )
-
 # ───────────────────────────────────────────
 #  1 銘柄バックテスト
 # ───────────────────────────────────────────
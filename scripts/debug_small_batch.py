@@ -26,6 +26,7 @@ from sepa_trade.technical_weekly import WeeklyTrendTemplate
 from sepa_trade.technical import TrendTemplate
 from sepa_trade.strategy.vcp_breakout import VCPStrategy
 from sepa_trade.rs import compute_rs_universe
+from sepa_trade.utils.tickers import load_tickers
 
 RAW_DIR = Path("data/raw")
 NDX_CSV = RAW_DIR / "nasdaq.csv"    # 事前に作成しておく
@@ -40,12 +41,7 @@ def parse_args() -> argparse.Namespace:
 def load_nasdaq100() -> list[str]:
     if not NDX_CSV.exists():
         raise FileNotFoundError(f"{NDX_CSV} がありません。先に CSV を用意してください。")
-    return (
-        pd.read_csv(NDX_CSV, header=None)[0]
-        .astype(str)
-        .str.upper()
-        .tolist()
-    )
+    return load_tickers(NDX_CSV)
 
 
 def main() -> None:
@@ -97,6 +93,7 @@ def main() -> None:
 
     # ★★★ ここで失敗理由カウンタを用意 ★★★
     fail_cnt = {
+        "data": 0,
         "rs": 0,
         "ma_order": 0,
         "ma40_slope": 0,
@@ -105,20 +102,13 @@ def main() -> None:
     }
 
     for tic, close in closes.items():
-        # ……(DataFrame → Series 統一の処理はそのまま)……
         # ---- Stage‑2 判定 ----
-        # 旧:
-        # weekly = close.resample("W-FRI").last()....
-
-        # 新: dropna 後、改めて DataFrame 化して wt を作成
-
-        # ---- Stage‑2 判定 ----
-        # 週足終値を取得し、必ず「Close」1 列の DataFrame に統一
+        # 週足終値を取得し、Series か「Close」1 列の DataFrame に統一
         weekly_raw = close.resample("W-FRI").last().ffill()   # 前週値で欠損補完
 
-        # ① Series → DataFrame 化
+        # ① Series はそのまま渡せる（DataFrame 化しない）
         if isinstance(weekly_raw, pd.Series):
-            weekly = weekly_raw.to_frame(name="Close")
+            weekly = weekly_raw
 
         # ② DataFrame の場合
         else:
@@ -152,41 +142,20 @@ def main() -> None:
         # WeeklyTrendTemplate 判定に進む
         wt = WeeklyTrendTemplate(weekly)
 
+        # ─── 不合格の内訳は passes() と同じ判定 (failed_condition) で集計 ───
+        reason = wt.failed_condition(rs_rating=rs_scores[tic])
+        if reason is not None:
+            fail_cnt[reason] += 1
 
+            if reason == "ma_order":
+                # << ここを絶対に実行させる >>
+                ind = wt.indicators
+                print(f"\nDEBUG {tic}:")
+                print(" price :", ind.price)
+                print(" ma10  :", ind.ma10)
+                print(" ma30  :", ind.ma30)
+                print(" ma40  :", ind.ma40)
 
-
-
-        # ─── 各条件ごとに if → continue ───
-        if rs_scores[tic] < wt.RS_THRESHOLD:
-            fail_cnt["rs"] += 1
-            continue
-
-        # ma_order 判定ブロック
-        if not (close.iloc[-1] > wt.ma30.iloc[-1] > wt.ma40.iloc[-1]
-                and close.iloc[-1] > wt.ma10.iloc[-1]):
-            fail_cnt["ma_order"] += 1
-
-            # << ここを絶対に実行させる >>
-            print(f"\nDEBUG {tic}:")
-            print(" price :", close.iloc[-1])
-            print(" ma10  :", wt.ma10.iloc[-1])
-            print(" ma30  :", wt.ma30.iloc[-1])
-            print(" ma40  :", wt.ma40.iloc[-1])
-
-            continue
-
-        if not (wt.ma40.iloc[-1] > wt.ma40.iloc[-4]):
-            fail_cnt["ma40_slope"] += 1
-            continue
-
-        pct_from_low = (close.iloc[-1] - close.min()) / close.min() * 100
-        if pct_from_low < wt.PCT_FROM_LOW_MIN:
-            fail_cnt["pct_from_low"] += 1
-            continue
-
-        pct_from_high = (close.max() - close.iloc[-1]) / close.max() * 100
-        if pct_from_high > wt.PCT_FROM_HIGH_MAX:
-            fail_cnt["pct_from_high"] += 1
             continue
 
         # ここまで全部通過で Stage‑2 合格
@@ -233,7 +202,5 @@ def main() -> None:
     print(f"VCP ブレイク   : {cnt_vcp}")
 
 
-
-
 if __name__ == "__main__":
     main()
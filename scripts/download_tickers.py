@@ -8,39 +8,120 @@ data/raw/ 配下に CSV 保存するユーティリティ。
 
 from __future__ import annotations
 
+import csv
+import hashlib
+import io
+import json
+import os
 import pathlib
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import lxml.html
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = pathlib.Path(".cache/tickers")  # 条件付き GET 用のレスポンスキャッシュ
+
+# 3 つの取得で共有するセッション（keep-alive で TLS ハンドシェイクを使い回す）
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "sepa-ticker-downloader/1.0"
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=3))
+
+
+def _cached_get(url: str) -> bytes:
+    """
+    ETag / Last-Modified を CACHE_DIR に保存して条件付き GET を送る。
+    304 (Not Modified) なら前回の本文をそのまま返し、再ダウンロードしない。
+    """
+    key = hashlib.sha1(url.encode()).hexdigest()
+    body_path = CACHE_DIR / f"{key}.body"
+    meta_path = CACHE_DIR / f"{key}.json"
+
+    headers = {}
+    if body_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = _SESSION.get(url, headers=headers, timeout=30)
+    if resp.status_code == 304:
+        return body_path.read_bytes()
+    resp.raise_for_status()
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    body_path.write_bytes(resp.content)
+    meta_path.write_text(json.dumps({
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }))
+    return resp.content
+
+
+def _write_symbols(path: pathlib.Path, symbols: list[str]) -> None:
+    """
+    1 行 1 ティッカー（ヘッダーなし）で保存
+    ・一時ファイルに bytes で一括書き込みしてから os.replace で差し替える
+      （書き込み途中で落ちても既存の CSV を壊さない）
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb", buffering=1 << 20) as fh:
+        fh.write(("\n".join(symbols) + "\n").encode("utf-8"))
+    os.replace(tmp, path)
+
+
+def _scrape_sp500_symbols(html: bytes) -> list[str]:
+    """
+    Wikipedia の構成銘柄テーブル (#constituents) だけを lxml で走査し、
+    各行の先頭セル（ティッカー）を取り出す。ページ内の他のテーブルは読まない。
+    """
+    tree = lxml.html.fromstring(html)
+    rows = tree.xpath('//table[@id="constituents"]//tr[td]')
+    return [row.xpath("./td[1]")[0].text_content().strip().replace(".", "-") for row in rows]
 
 
 def save_sp500(path: pathlib.Path) -> None:
     url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-
-    tables = pd.read_html(resp.text)
-    if not tables:
+    sp = _scrape_sp500_symbols(_cached_get(url))
+    if not sp:
         raise RuntimeError("S&P500 テーブル抽出に失敗")
 
-    sp = tables[0]["Symbol"].str.replace(r"\.", "-", regex=True)
-    sp.to_csv(path, index=False, header=False)
+    _write_symbols(path, sp)
     print(f"S&P500: {len(sp)} tickers saved → {path}")
 
 
+def _iter_pipe_rows(url: str) -> Iterator[dict[str, str]]:
+    """
+    NASDAQTrader の '|' 区切りファイルを 1 行ずつ dict で返す。
+    末尾の "File Creation Time" 行とテスト銘柄は読み飛ばす。
+    """
+    # 使うのは Symbol / Exchange / Test Issue 列だけなので、銘柄名の非 ASCII は置換で読み流す
+    text = _cached_get(url).decode("utf-8", errors="replace")
+    for row in csv.DictReader(io.StringIO(text), delimiter="|"):
+        first = next(iter(row.values()), "") or ""
+        if first.startswith("File Creation Time") or row.get("Test Issue") == "Y":
+            continue
+        yield row
+
+
 def save_nasdaq(path: pathlib.Path) -> None:
-    url = "ftp://ftp.nasdaqtrader.com/SymbolDirectory/nasdaqlisted.txt"
-    nas_df = pd.read_csv(url, sep="|")
-    nas = nas_df["Symbol"].str.replace(r"\^", "", regex=True)
-    nas.to_csv(path, index=False, header=False)
+    url = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+    nas = [row["Symbol"].replace("^", "") for row in _iter_pipe_rows(url) if row["Symbol"]]
+    _write_symbols(path, nas)
     print(f"NASDAQ: {len(nas)} tickers saved → {path}")
 
 
 def save_nyse(path: pathlib.Path) -> None:
-    url = "ftp://ftp.nasdaqtrader.com/SymbolDirectory/otherlisted.txt"
-    oth_df = pd.read_csv(url, sep="|")
-    nyse = oth_df.loc[oth_df["Exchange"] == "N", "ACT Symbol"].str.replace(r"\^", "", regex=True)
-    nyse.to_csv(path, index=False, header=False)
+    url = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+    nyse = [
+        row["ACT Symbol"].replace("^", "")
+        for row in _iter_pipe_rows(url)
+        if row.get("Exchange") == "N" and row["ACT Symbol"]
+    ]
+    _write_symbols(path, nyse)
     print(f"NYSE: {len(nyse)} tickers saved → {path}")
 
 
@@ -48,13 +129,19 @@ def main() -> None:
     root = pathlib.Path("data/raw")
     root.mkdir(parents=True, exist_ok=True)
 
+    # 3 つの取得は互いに独立した通信待ちなので並列に実行する（保存先も別ファイル）
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        sp500 = ex.submit(save_sp500, root / "sp500.csv")
+        nasdaq = ex.submit(save_nasdaq, root / "nasdaq.csv")
+        nyse = ex.submit(save_nyse, root / "nyse.csv")
+
     try:
-        save_sp500(root / "sp500.csv")
+        sp500.result()
     except Exception as e:
         print("⚠️  S&P500 取得失敗:", e, file=sys.stderr)
 
-    save_nasdaq(root / "nasdaq.csv")
-    save_nyse(root / "nyse.csv")
+    nasdaq.result()
+    nyse.result()
 
 
 if __name__ == "__main__":
@@ -19,13 +19,13 @@ import argparse
 import datetime as dt
 import logging
 from pathlib import Path
-from typing import List
 
 import pandas as pd
 from dotenv import load_dotenv
 load_dotenv()  # .env があれば自動で環境変数に展開
 
 from sepa_trade.pipeline.screener import SepaScreener
+from sepa_trade.utils.tickers import load_tickers
 
 
 def parse_args() -> argparse.Namespace:
@@ -49,18 +49,6 @@ def parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
-def load_tickers(path: Path) -> List[str]:
-    """Loads tickers from a single-column CSV file, cleaning them up."""
-    return (
-        pd.read_csv(path, header=None)
-        .iloc[:, 0]
-        .astype(str)
-        .str.strip()
-        .str.upper()
-        .tolist()
-    )
-
-
 def main() -> None:
     logging.basicConfig(
         level=logging.INFO,
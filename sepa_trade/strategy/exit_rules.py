@@ -12,8 +12,36 @@ SEPA公式のリスク管理“下限”に合わせて、ATRストップの係
 
 from __future__ import annotations
 
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
+from sepa_trade.utils.indicators import true_range
+
+ATR_CACHE_SIZE = 4096  # 直近 ATR(10) のメモ化件数
+
+
+def latest_atr10(df: pd.DataFrame) -> float:
+    """
+    最新の ATR(10) を返す。
+    必要なのは直近 11 本（前日終値 + 10 本）だけなので、その部分のバイト列を
+    キーにメモ化し、同じ銘柄・同じ日の再評価では再計算しない。
+    """
+    tail = df[["High", "Low", "Close"]].iloc[-11:].to_numpy(dtype=np.float64)
+    return _atr10_from_bytes(tail.tobytes())
+
+
+@lru_cache(maxsize=ATR_CACHE_SIZE)
+def _atr10_from_bytes(sig: bytes) -> float:
+    """High/Low/Close を行優先で並べたバイト列から最新の ATR(10) を計算"""
+    hlc = np.frombuffer(sig, dtype=np.float64).reshape(-1, 3)
+    if hlc.shape[0] < 11:
+        return float("nan")
+    # 先頭行は前日終値としてだけ使う（rolling(10).mean() と同じく NaN があれば NaN）
+    tr = true_range(hlc[:, 0], hlc[:, 1], hlc[:, 2])
+    return float(tr[1:].mean())
+
 
 class ExitStrategy:
     """
@@ -33,17 +61,6 @@ class ExitStrategy:
         self.df = df.copy()
         self.entry_price = entry_price
 
-        # ATR(10) 計算
-        tr = pd.concat(
-            [
-                self.df["High"] - self.df["Low"],
-                (self.df["High"] - self.df["Close"].shift()).abs(),
-                (self.df["Low"] - self.df["Close"].shift()).abs(),
-            ],
-            axis=1,
-        ).max(axis=1)
-        self.df["ATR10"] = tr.rolling(10).mean()
-
         # 10EMA 計算
         self.df["EMA10"] = self.df["Close"].ewm(span=10, adjust=False).mean()
 
@@ -55,12 +72,12 @@ class ExitStrategy:
         エントリー価格を基準とした固定の損切りです。
         """
         # 最新のATRが計算できない(NaN)場合は、判定不可としてFalseを返す
-        latest_atr = self.df["ATR10"].iloc[-1]
-        if pd.isna(latest_atr):
+        latest_atr = latest_atr10(self.df)
+        if np.isnan(latest_atr):
             return False
 
         stop_price = self.entry_price - latest_atr * n
-        return self.df["Low"].iloc[-1] < stop_price
+        return bool(self.df["Low"].iloc[-1] < stop_price)
 
     def ema_cross(self) -> bool:
         """終値が 10EMA を割り込んだら True"""
@@ -69,4 +86,4 @@ class ExitStrategy:
         if pd.isna(latest_ema):
             return False
 
-        return self.df["Close"].iloc[-1] < latest_ema
+        return bool(self.df["Close"].iloc[-1] < latest_ema)
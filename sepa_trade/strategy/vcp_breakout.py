@@ -16,11 +16,16 @@ from dataclasses import dataclass
 import logging
 from typing import Tuple, Optional
 
+import numpy as np
 import pandas as pd
 
+from sepa_trade.utils.indicators import njit, sma, true_range
+
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+MIN_HISTORY = 60  # 判定に必要な最低日数
+
 @dataclass
 class BreakoutSignal:
     breakout_price: float   # ブレイク時終値
@@ -49,25 +54,23 @@ class VCPStrategy:
         shrink_ratio: float = 0.5,
         volume_ratio: float = 1.5,
     ) -> None:
-        self.df = df_daily.copy()
         self.shrink_steps = shrink_steps
         self.shrink_ratio = shrink_ratio
         self.volume_ratio = volume_ratio
 
-        self.df["Range"] = self.df["High"] - self.df["Low"]
-        self.df["ATR10"] = (
-            pd.concat(
-                [
-                    self.df["High"] - self.df["Low"],
-                    (self.df["High"] - self.df["Close"].shift()).abs(),
-                    (self.df["Low"] - self.df["Close"].shift()).abs(),
-                ],
-                axis=1,
-            )
-            .max(axis=1)
-            .rolling(10)
-            .mean()
-        )
+        # DataFrame 全体はコピーせず、必要な 4 列だけを配列で保持する。
+        # 高値・安値は比率比較にしか使わないので float32 で十分。
+        # 終値と ATR は注文価格・損切り価格に使うので float64 のまま、出来高は元の dtype のまま。
+        high = df_daily["High"].to_numpy(dtype=np.float64)
+        low = df_daily["Low"].to_numpy(dtype=np.float64)
+        self.high = high.astype(np.float32)
+        self.close = df_daily["Close"].to_numpy(dtype=np.float64)
+        self.volume = df_daily["Volume"].to_numpy()
+
+        # 安値はレンジの計算にしか使わないので属性には残さない
+        self.range_ = self.high - low.astype(np.float32)
+        # ATR(10): True Range を NumPy で一括計算し、累積和で移動平均
+        self.atr10 = sma(true_range(high, low, self.close), 10)
 
     # ──────────────────────────────
     # 公開 API
@@ -81,59 +84,107 @@ class VCPStrategy:
         (flag, signal)
             flag が True のとき、signal に BreakoutSignal インスタンスを返す
         """
-        if len(self.df) < 60:
+        if len(self.close) < MIN_HISTORY:
             logger.debug("データ不足 (60日未満) のため VCP チェックをスキップ")
             return False, None  # データ不足
 
-        today = self.df.iloc[-1]
-
-        # --- 1. ピボットブレイクの確認 ---
-        # 直近20日（昨日まで）の高値をピボットポイントとする
-        pivot_high = self.df["High"].iloc[-21:-1].max()
-        if today["Close"] < pivot_high * 1.01:
+        flag, breakout_price, atr = _check_bar(
+            self.close, self.high, self.volume, self.atr10, self.range_,
+            self.shrink_steps, self.shrink_ratio, self.volume_ratio,
+            len(self.close) - 1,
+        )
+        logger.debug("VCP ブレイクアウトチェック: Pass=%s", flag)
+        if not flag:
             return False, None
 
-        # --- 2. 出来高急増の確認 ---
-        # 直近20日（昨日まで）の平均出来高
-        avg_volume_20d = self.df["Volume"].iloc[-21:-1].mean()
-        volume_threshold = avg_volume_20d * self.volume_ratio
+        # すべての条件を満たした場合、シグナルを生成
+        # （ATR はブレイクアウト前日の値）
+        return True, BreakoutSignal(breakout_price=breakout_price, atr=atr)
+
+    def check_all(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        全期間の各日を「当日」とみなして VCP ブレイクアウトを一括判定（バックテスト用）。
+        各日の判定はその日までのデータのみを使う。
 
-        volume_passes = today["Volume"] >= volume_threshold
-        logger.debug(
-            "出来高チェック: Today=%d, Avg20=%d, Threshold=%d, Pass=%s",
-            today["Volume"], avg_volume_20d, volume_threshold, volume_passes
+        Returns
+        -------
+        (flags, breakout_prices, atrs)
+            いずれも日足と同じ長さの配列。シグナルのない日の価格・ATR は NaN
+        """
+        return _check_all(
+            self.close, self.high, self.volume, self.atr10, self.range_,
+            self.shrink_steps, self.shrink_ratio, self.volume_ratio,
         )
-        if not volume_passes:
-            return False, None
 
-        # --- 3. ボラティリティ収縮の確認 ---
-        is_contracting = self._is_volatility_contracting()
-        logger.debug("ボラティリティ収縮チェック: Pass=%s", is_contracting)
-        if not is_contracting:
-            return False, None
 
-        # すべての条件を満たした場合、シグナルを生成
-        signal = BreakoutSignal(
-            breakout_price=today["Close"],
-            atr=self.df["ATR10"].iloc[-2]  # 修正: ブレイクアウト前日のATRを使用
-        )
-        return True, signal
+# ──────────────────────────────
+# JIT カーネル
+# ──────────────────────────────
 
-    # ──────────────────────────────
-    # 内部メソッド
-    # ──────────────────────────────
-    def _is_volatility_contracting(self) -> bool:
-        """ブレイクアウト前日にかけて、高値-安値レンジが shrink_steps 回以上、連続で収縮しているか判定。"""
-        # 比較に必要な期間の日数を計算 (例: 2回収縮を確認するには3日分のレンジが必要)
-        required_days = self.shrink_steps + 1
-        if len(self.df) < required_days + 1:  # +1 はブレイクアウト当日分
+@njit(cache=True, nogil=True)
+def _is_contracting(range_, end, shrink_steps, shrink_ratio):
+    """
+    end 日目を含まない直近 shrink_steps + 1 日の高値-安値レンジが、
+    連続で前日の shrink_ratio 倍未満に収縮しているか判定。
+    (例: 2回収縮を確認するには3日分のレンジが必要)
+    """
+    start = end - (shrink_steps + 1)
+    if start < 0:
+        return False
+    for j in range(start + 1, end):
+        if not range_[j] < range_[j - 1] * shrink_ratio:
             return False
+    return True
 
-        # ブレイクアウト当日を含まない、直近のレンジを取得
-        ranges = self.df["Range"].iloc[-(required_days + 1) : -1]
 
-        # ジェネレータ式と all() を使い、すべての収縮条件が満たされるかチェック
-        return all(
-            ranges.iloc[i] < ranges.iloc[i - 1] * self.shrink_ratio
-            for i in range(1, len(ranges))
+@njit(cache=True)
+def _check_bar(close, high, volume, atr10, range_,
+               shrink_steps, shrink_ratio, volume_ratio, i):
+    """
+    i 日目を当日とした VCP ブレイクアウト判定。
+
+    Returns
+    -------
+    (flag, breakout_price, atr)
+        flag が False のとき価格と ATR は NaN
+    """
+    if i + 1 < MIN_HISTORY:
+        return False, np.nan, np.nan
+
+    # --- 1. ピボットブレイクの確認 ---
+    # 直近20日（前日まで）の高値をピボットポイントとする（NaN は除外）
+    pivot_high = np.nanmax(high[i - 20:i])
+    if not (close[i] >= pivot_high * 1.01):
+        return False, np.nan, np.nan
+
+    # --- 2. 出来高急増の確認 ---
+    # 直近20日（前日まで）の平均出来高（pandas の mean と同じく NaN は除外）
+    avg_volume_20d = np.nanmean(volume[i - 20:i])
+    # NaN を含む比較は False になるので「合格条件を満たさない」形で判定する
+    if not (volume[i] >= avg_volume_20d * volume_ratio):
+        return False, np.nan, np.nan
+
+    # --- 3. ボラティリティ収縮の確認 ---
+    if not _is_contracting(range_, i, shrink_steps, shrink_ratio):
+        return False, np.nan, np.nan
+
+    return True, float(close[i]), float(atr10[i - 1])
+
+
+@njit(cache=True)
+def _check_all(close, high, volume, atr10, range_,
+               shrink_steps, shrink_ratio, volume_ratio):
+    """全日について _check_bar を実行し、結果を配列で返す"""
+    n = close.shape[0]
+    flags = np.zeros(n, dtype=np.bool_)
+    prices = np.full(n, np.nan)
+    atrs = np.full(n, np.nan)
+    for i in range(n):
+        flag, price, atr = _check_bar(
+            close, high, volume, atr10, range_,
+            shrink_steps, shrink_ratio, volume_ratio, i,
         )
+        flags[i] = flag
+        prices[i] = price
+        atrs[i] = atr
+    return flags, prices, atrs
@@ -3,14 +3,18 @@ technical.py
 
 Mark Minervini の「トレンドテンプレート」8 条件を判定するクラス。
 短期〜中期スイングのスクリーニングに使用する最初のフィルター。
+ユニバース全体を一括判定する ``screen_many`` も提供する。
 """
 
 from __future__ import annotations
 
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from sepa_trade.utils.indicators import is_monotonic_increasing, sma
+
 
 class TrendTemplate:
     """
@@ -21,6 +25,8 @@ class TrendTemplate:
         昇順（古い→新しい）の並びを前提とする。
     """
 
+    RS_THRESHOLD = 70  # RSレーティングの下限値
+
     # ───────────────────
     # 初期化と準備
     # ───────────────────
@@ -28,17 +34,18 @@ class TrendTemplate:
         if "Close" not in price_df.columns:
             raise ValueError("price_df に 'Close' 列が必要です。")
 
-        self.df = price_df.copy()
-        # 単純移動平均線を計算
-        self.df["MA50"] = self.df["Close"].rolling(50).mean()
-        self.df["MA150"] = self.df["Close"].rolling(150).mean()
-        self.df["MA200"] = self.df["Close"].rolling(200).mean()
+        # 終値と各移動平均線は NumPy 配列で保持（pandas の索引コストを避ける）
+        self.close = price_df["Close"].to_numpy(dtype=np.float64)
+        self.ma50 = sma(self.close, 50)
+        self.ma150 = sma(self.close, 150)
+        self.ma200 = sma(self.close, 200)
 
     # ───────────────────
     # 公開 API
     # ───────────────────
     def passes(
         self,
+        rs_rating: Optional[float] = None,
         pct_from_low: Optional[float] = None,
         pct_from_high: Optional[float] = None,
         ma200_lookback: int = 30,
@@ -48,6 +55,8 @@ class TrendTemplate:
 
         Parameters
         ----------
+        rs_rating : float, optional
+            RS レーティング (0–100)。指定時のみ ``RS_THRESHOLD`` 以上かを判定。
         pct_from_low : float, optional
             52 週安値からの上昇率 (%). 未指定なら内部で計算。
         pct_from_high : float, optional
@@ -61,17 +70,34 @@ class TrendTemplate:
             8 条件すべて満たせば True
         """
         # 計算に必要なデータが揃っているか確認
-        if len(self.df) < 252:
+        if len(self.close) < 252:
             return False
 
-        latest = self.df.iloc[-1]
-        close = latest["Close"]
+        # 最新値をスカラーとして一度だけ取り出す
+        close = float(self.close[-1])
+        ma50 = float(self.ma50[-1])
+        ma150 = float(self.ma150[-1])
+        ma200 = float(self.ma200[-1])
+
+        # トレンドテンプレート8条件（安い判定から順に、不合格が確定した時点で打ち切る）
+        # 1. 現在の株価 > 150日MA and 200日MA
+        if not (close > ma150 and close > ma200):
+            return False
+        # 2. 150日MA > 200日MA
+        if not ma150 > ma200:
+            return False
+        # 4. 50日MA > 150日MA and 200日MA
+        if not (ma50 > ma150 and ma50 > ma200):
+            return False
+        # 5. 現在の株価 > 50日MA
+        if not close > ma50:
+            return False
 
         # 52 週高値・安値との位置関係を計算
         if pct_from_low is None or pct_from_high is None:
             window = 252  # ≒ 52 週
-            rolling_high = self.df["Close"].rolling(window=window).max().iloc[-1]
-            rolling_low = self.df["Close"].rolling(window=window).min().iloc[-1]
+            rolling_high = float(self.close[-window:].max())
+            rolling_low = float(self.close[-window:].min())
 
             # ゼロ除算を防止
             if rolling_low <= 0 or rolling_high <= 0:
@@ -82,25 +108,20 @@ class TrendTemplate:
             if pct_from_high is None:
                 pct_from_high = (rolling_high - close) / rolling_high * 100
 
-        # トレンドテンプレート8条件
-        conditions = [
-            # 1. 現在の株価 > 150日MA and 200日MA
-            close > latest["MA150"] and close > latest["MA200"],
-            # 2. 150日MA > 200日MA
-            latest["MA150"] > latest["MA200"],
-            # 3. 200日MAが少なくとも1ヶ月間上昇トレンド
-            self._ma200_is_rising(ma200_lookback),
-            # 4. 50日MA > 150日MA and 200日MA
-            latest["MA50"] > latest["MA150"] and latest["MA50"] > latest["MA200"],
-            # 5. 現在の株価 > 50日MA
-            close > latest["MA50"],
-            # 6. 現在の株価が52週安値から30%以上高い
-            pct_from_low >= 30,
-            # 7. 現在の株価が52週高値から25%以内
-            pct_from_high <= 25,
-        ]
-
-        return all(conditions)
+        # 6. 現在の株価が52週安値から30%以上高い
+        if not pct_from_low >= 30:
+            return False
+        # 7. 現在の株価が52週高値から25%以内
+        if not pct_from_high <= 25:
+            return False
+        # 8. RSレーティングが下限値以上（NaN は不合格）
+        if rs_rating is not None and not rs_rating >= self.RS_THRESHOLD:
+            return False
+        # 3. 200日MAが少なくとも1ヶ月間上昇トレンド（最も重いので最後に判定）
+        if not self._ma200_is_rising(ma200_lookback):
+            return False
+
+        return True
 
     # ───────────────────
     # 内部ユーティリティ
@@ -109,8 +130,78 @@ class TrendTemplate:
         """
         200 日 MA が直近 `lookback` 日で上昇傾向かどうか。
         """
-        series = self.df["MA200"].dropna()
-        if len(series) < lookback:
+        # 先頭 199 本はウォームアップ期間で必ず NaN なので、dropna せずスライスで除く
+        valid = self.ma200[199:]
+        if valid.size < lookback:
             return False
-        # monotonic_increasing は True/False
-        return series.iloc[-lookback:].is_monotonic_increasing
+        # JIT 化した単調増加チェック（最初の違反で即 return、NaN を含めば False）
+        return is_monotonic_increasing(valid[-lookback:])
+
+
+# ───────────────────
+# ユニバース一括判定
+# ───────────────────
+def screen_many(closes: np.ndarray, ma200_lookback: int = 30) -> np.ndarray:
+    """
+    複数銘柄のトレンドテンプレートを銘柄軸でベクトル化して一括判定する。
+
+    ``TrendTemplate(df).passes(ma200_lookback=...)`` を銘柄ごとに呼ぶのと
+    同じ結果を、Python のループなしで返す。
+
+    Parameters
+    ----------
+    closes : np.ndarray
+        shape = (銘柄数, 日数) の終値行列。列は日付昇順で全銘柄揃えておくこと。
+        例: ``pd.concat(close_dict, axis=1).to_numpy().T``
+    ma200_lookback : int
+        200 日移動平均線の「上向き」判定期間（日数）。
+
+    Returns
+    -------
+    np.ndarray
+        shape = (銘柄数,) の bool 配列
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim != 2:
+        raise ValueError("closes は (銘柄数, 日数) の 2 次元配列である必要があります。")
+
+    n_tickers, n_days = closes.shape
+    window = 252  # ≒ 52 週
+    # MA200 の上向き判定には 199 + lookback 日分が必要
+    required = max(window, 199 + ma200_lookback)
+    if n_days < required:
+        return np.zeros(n_tickers, dtype=bool)
+
+    # 必要な末尾だけを対象に累積和を取り、各 MA を差分で求める
+    tail = closes[:, -required:]
+    cs = np.zeros((n_tickers, required + 1))
+    np.cumsum(tail, axis=1, out=cs[:, 1:])
+
+    close = tail[:, -1]
+    ma50 = (cs[:, -1] - cs[:, -51]) / 50
+    ma150 = (cs[:, -1] - cs[:, -151]) / 150
+    ma200_tail = (cs[:, -ma200_lookback:] - cs[:, -ma200_lookback - 200:-200]) / 200
+    ma200 = ma200_tail[:, -1]
+
+    rolling_high = tail[:, -window:].max(axis=1)
+    rolling_low = tail[:, -window:].min(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_from_low = (close - rolling_low) / rolling_low * 100
+        pct_from_high = (rolling_high - close) / rolling_high * 100
+
+    ma200_rising = (
+        np.all(np.diff(ma200_tail, axis=1) >= 0, axis=1)
+        & ~np.isnan(ma200_tail).any(axis=1)
+    )
+
+    return (
+        (close > ma150) & (close > ma200)
+        & (ma150 > ma200)
+        & ma200_rising
+        & (ma50 > ma150) & (ma50 > ma200)
+        & (close > ma50)
+        & (rolling_low > 0) & (rolling_high > 0)
+        & (pct_from_low >= 30)
+        & (pct_from_high <= 25)
+    )
@@ -6,15 +6,33 @@ technical_weekly.py
 
 from __future__ import annotations
 
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
 
+@dataclass(frozen=True)
+class WeeklyIndicators:
+    """Stage‑2 判定に使う最新の指標値"""
+    price: float       # 最新の週足終値
+    ma10: float        # 10週MA
+    ma30: float        # 30週MA
+    ma40: float        # 40週MA
+    ma40_prev: float   # 3 週前の 40週MA（上向き判定用）
+    low_52w: float     # 52週安値
+    high_52w: float    # 52週高値
+
+
 class WeeklyTrendTemplate:
     """
     Parameters
     ----------
-    df_weekly : pd.DataFrame
-        インデックス昇順、列 ``Close`` を持つ週足 DataFrame
+    df_weekly : pd.DataFrame | pd.Series
+        インデックス昇順、列 ``Close`` を持つ週足 DataFrame、
+        または週足終値の Series（DataFrame 化せずにそのまま渡せる）
     """
 
     # ───────── 公式 Stage‑2 判定の下限値 ───────────
@@ -22,65 +40,94 @@ class WeeklyTrendTemplate:
     PCT_FROM_LOW_MIN = 30      # 52週安値からの最低上昇率 (%)
     PCT_FROM_HIGH_MAX = 25     # 52週高値からの最大下落率 (%)
 
-    def __init__(self, df_weekly: pd.DataFrame) -> None:
-        self.df = df_weekly.copy()
-        self.close = self.df["Close"]
+    def __init__(self, df_weekly: pd.DataFrame | pd.Series) -> None:
+        close = df_weekly if isinstance(df_weekly, pd.Series) else df_weekly["Close"]
+        self.close = close.to_numpy(dtype=np.float64)
 
-        # 移動平均線
-        self.ma10 = self.close.rolling(10).mean()
-        self.ma30 = self.close.rolling(30).mean()
-        self.ma40 = self.close.rolling(40).mean()
-
-        # 52週高値・安値
-        self.low_52w = self.close.rolling(52).min()
-        self.high_52w = self.close.rolling(52).max()
+    # ──────────────────────────────
+    # 指標（初回アクセス時に計算してキャッシュ）
+    # ──────────────────────────────
+    @cached_property
+    def indicators(self) -> Optional[WeeklyIndicators]:
+        """
+        判定に使う最新の指標値。データが 52 週未満なら None。
+        必要なのは各MAの最新値と 3 週前の 40週MA だけなので、
+        末尾 43 週の累積和 1 本から差分で求める（全期間の MA 配列は作らない）。
+        """
+        # データ期間のチェック (最も長い期間を要する52週高安値に合わせる)
+        if len(self.close) < 52:
+            return None
+
+        cs = np.concatenate(([0.0], np.cumsum(self.close[-43:])))
+        window_52w = self.close[-52:]
+        return WeeklyIndicators(
+            price=float(self.close[-1]),
+            ma10=float((cs[-1] - cs[-11]) / 10),
+            ma30=float((cs[-1] - cs[-31]) / 30),
+            ma40=float((cs[-1] - cs[-41]) / 40),
+            ma40_prev=float((cs[-4] - cs[-44]) / 40),
+            low_52w=float(window_52w.min()),
+            high_52w=float(window_52w.max()),
+        )
 
     # ──────────────────────────────
     # 公開 API
     # ──────────────────────────────
-    def passes(self) -> bool:
+    def passes(self, rs_rating: Optional[float] = None) -> bool:
         """
         Stage‑2 条件をすべて満たすかを判定。
 
+        Parameters
+        ----------
+        rs_rating : float, optional
+            RS レーティング (0–100)。指定時のみ ``RS_THRESHOLD`` 以上かを判定。
+
         Returns
         -------
         bool
         """
-        # データ期間のチェック (最も長い期間を要する52週高安値に合わせる)
-        if len(self.close) < 52:
-            return False
+        return self.failed_condition(rs_rating) is None
+
+    def failed_condition(self, rs_rating: Optional[float] = None) -> Optional[str]:
+        """
+        最初に不合格となった条件名を返す（すべて満たせば None）。
+        安い判定から順に評価し、不合格が確定した時点で打ち切る。
 
-        # 2. 移動平均線のトレンドと順序をチェック
-        price = self.close.iloc[-1]
-        ma10 = self.ma10.iloc[-1]
-        ma30 = self.ma30.iloc[-1]
-        ma40 = self.ma40.iloc[-1]
+        Returns
+        -------
+        str or None
+            "data" / "ma_order" / "ma40_slope" / "rs" / "pct_from_low" / "pct_from_high"
+        """
+        ind = self.indicators
+        if ind is None:
+            return "data"
 
         # 2a. MAの順序: 株価 > 短期 > 中期 > 長期
         #    Minerviniのトレンドテンプレートを週足に適用した強力な条件。
         #    株価が上昇トレンドにあり、かつ短期・中期・長期のトレンドが
         #    すべて上向きに揃っていることを確認します。
         #    (修正点: 10週MAが30週MAを上回る条件を追加し、より厳格化)
-        if not (price > ma10 > ma30 > ma40):
-            return False
+        if not (ind.price > ind.ma10 > ind.ma30 > ind.ma40):
+            return "ma_order"
 
         # 2b. 40週MA(長期)が上昇トレンドにあるか
-        if not (self.ma40.iloc[-1] > self.ma40.iloc[-4]):  # 1か月＝4週
-            return False
+        if not (ind.ma40 > ind.ma40_prev):  # 1か月＝4週
+            return "ma40_slope"
 
-        # 3. 52週高値・安値からの位置を判定
-        low_52w = self.low_52w.iloc[-1]
-        high_52w = self.high_52w.iloc[-1]
+        # 2c. RSレーティングが下限値以上か（NaN は不合格）
+        if rs_rating is not None and not rs_rating >= self.RS_THRESHOLD:
+            return "rs"
 
-        if low_52w <= 0:  # ゼロ除算を防止
-            return False
+        # 3. 52週高値・安値からの位置を判定
+        if ind.low_52w <= 0:  # ゼロ除算を防止
+            return "pct_from_low"
 
-        pct_from_low = (price - low_52w) / low_52w * 100
+        pct_from_low = (ind.price - ind.low_52w) / ind.low_52w * 100
         if pct_from_low < self.PCT_FROM_LOW_MIN:
-            return False
+            return "pct_from_low"
 
-        pct_from_high = (high_52w - price) / high_52w * 100
+        pct_from_high = (ind.high_52w - ind.price) / ind.high_52w * 100
         if pct_from_high > self.PCT_FROM_HIGH_MAX:
-            return False
+            return "pct_from_high"
 
-        return True
+        return None
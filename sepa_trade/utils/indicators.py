@@ -0,0 +1,76 @@
+"""
+indicators.py  ― 数値計算ユーティリティ
+------------------------------------------------
+・スクリーニングのホットパスで使う NumPy / Numba カーネル
+・numba が未インストールの環境では純 Python 実装にフォールバック
+"""
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba なしでも動作させる
+    def njit(*args, **kwargs):
+        """numba.njit の代替（何もしないデコレータ）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def _as_float(a: np.ndarray) -> np.ndarray:
+    """浮動小数の配列はそのまま、それ以外は float64 に変換"""
+    a = np.asarray(a)
+    if a.dtype.kind != "f":
+        a = a.astype(np.float64)
+    return a
+
+
+@njit(cache=True, nogil=True)
+def is_monotonic_increasing(a: np.ndarray) -> bool:
+    """
+    1 次元配列が単調非減少かを判定（NaN を含む場合は False）。
+    pandas の ``Series.is_monotonic_increasing`` と同じ結果を返す。
+    """
+    for i in range(a.shape[0]):
+        if np.isnan(a[i]):
+            return False
+        if i > 0 and a[i] < a[i - 1]:
+            return False
+    return True
+
+
+def sma(a: np.ndarray, window: int) -> np.ndarray:
+    """
+    累積和の差分で単純移動平均を計算（``rolling(window).mean()`` 相当）。
+    窓内に NaN を含む位置と、先頭 ``window - 1`` 本は NaN になる。
+    入力が float32 なら float32 で返す（累積和は精度確保のため float64）。
+    """
+    a = _as_float(a)
+    out = np.full(a.shape[0], np.nan, dtype=a.dtype)
+    if a.shape[0] < window:
+        return out
+
+    nan_mask = np.isnan(a)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(nan_mask, 0.0, a), dtype=np.float64)))
+    nan_cs = np.concatenate(([0], np.cumsum(nan_mask)))
+
+    out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    out[window - 1:][(nan_cs[window:] - nan_cs[:-window]) > 0] = np.nan
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    True Range = max(High-Low, |High-前日Close|, |Low-前日Close|)。
+    初日は前日終値がないため High-Low を使う。
+    """
+    high = _as_float(high)
+    low = _as_float(low)
+    prev_close = np.empty_like(high)
+    prev_close[:1] = np.nan
+    prev_close[1:] = np.asarray(close, dtype=high.dtype)[:-1]
+
+    # fmax は NaN を無視するので、pandas の max(axis=1) と同じ挙動になる
+    tr = np.fmax(high - low, np.abs(high - prev_close))
+    return np.fmax(tr, np.abs(low - prev_close))
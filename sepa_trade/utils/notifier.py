@@ -17,17 +17,29 @@ TWITTER_ACCESS_SECRET     : Access Secret
 
 # Discord
 DISCORD_WEBHOOK_URL       : Webhook URL
+
+※ 環境変数はプロセス内で最初の SNSNotifier 生成時に一度だけ読み込む。
 """
 
 from __future__ import annotations
 
+import functools
+import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Literal, Optional
 
 import requests
 import requests_oauthlib
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson なしでも標準 json で動作させる
+    orjson = None
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -35,6 +47,40 @@ logger = logging.getLogger(__name__)
 # 定数
 TWITTER_API_URL = "https://api.twitter.com/2/tweets"
 REQUEST_TIMEOUT = 10
+POOL_CONNECTIONS = 4   # 接続プールを保持するホスト数
+POOL_MAXSIZE = 8       # ホストごとの最大接続数
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _dumps(payload: dict) -> bytes:
+    """JSON ペイロードを bytes にシリアライズ（orjson があれば優先）"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=1)
+def _twitter_auth() -> Optional[requests_oauthlib.OAuth1]:
+    """環境変数から X (Twitter) の OAuth1 認証を生成（初回のみ）"""
+    api_key = os.getenv("TWITTER_API_KEY")
+    api_secret = os.getenv("TWITTER_API_SECRET")
+    access_token = os.getenv("TWITTER_ACCESS_TOKEN")
+    access_secret = os.getenv("TWITTER_ACCESS_SECRET")
+
+    if not all((api_key, api_secret, access_token, access_secret)):
+        return None
+    return requests_oauthlib.OAuth1(
+        api_key,
+        api_secret,
+        access_token,
+        access_secret,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _discord_url() -> Optional[str]:
+    """環境変数から Discord Webhook URL を取得（初回のみ）"""
+    return os.getenv("DISCORD_WEBHOOK_URL")
 
 
 @dataclass
@@ -50,22 +96,30 @@ class SNSNotifier:
     """X / Discord へシグナル投稿"""
 
     def __init__(self) -> None:
-        # X (Twitter) 認証情報
-        self._tw_auth = None
-        api_key = os.getenv("TWITTER_API_KEY")
-        api_secret = os.getenv("TWITTER_API_SECRET")
-        access_token = os.getenv("TWITTER_ACCESS_TOKEN")
-        access_secret = os.getenv("TWITTER_ACCESS_SECRET")
-
-        if all((api_key, api_secret, access_token, access_secret)):
-            self._tw_auth = requests_oauthlib.OAuth1(
-                api_key,
-                api_secret,
-                access_token,
-                access_secret,
-            )
-
-        self.discord_url = os.getenv("DISCORD_WEBHOOK_URL")
+        # 認証情報はモジュール単位でキャッシュ済みのものを使う
+        self._tw_auth = _twitter_auth()
+        self.discord_url = _discord_url()
+
+        # 連続投稿で TCP/TLS ハンドシェイクを繰り返さないよう、セッションを使い回す
+        self._session = requests.Session()
+        # 投稿は POST（非冪等）なので、リクエスト送信前の接続エラーだけ再試行する
+        # （応答後の再送は二重投稿になり得るため行わない）
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(connect=3, read=0, status=0),
+        )
+        self._session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """HTTP セッションを閉じる"""
+        self._session.close()
+
+    def __enter__(self) -> SNSNotifier:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     # ──────────────────────────────
     # 公開 API
@@ -74,20 +128,7 @@ class SNSNotifier:
         """各 SNS へ投稿"""
         text = self._format_text(msg)
 
-        posted_successfully = False
-        if self._tw_auth:
-            try:
-                self._post_twitter(text)
-                posted_successfully = True
-            except RuntimeError as e:
-                logger.error("Twitterへの投稿に失敗しました: %s", e)
-
-        if self.discord_url:
-            try:
-                self._post_discord(text)
-                posted_successfully = True
-            except RuntimeError as e:
-                logger.error("Discordへの投稿に失敗しました: %s", e)
+        posted_successfully = self._post_all(text)
 
         if not posted_successfully:
             logger.warning("⚠️  SNSへの投稿がありませんでした。コンソールに出力します:\n%s", text)
@@ -95,6 +136,27 @@ class SNSNotifier:
     # ──────────────────────────────
     # 内部投稿メソッド
     # ──────────────────────────────
+    def _post_all(self, text: str) -> bool:
+        """設定済みの SNS へ並列に投稿し、1 件でも成功すれば True"""
+        posters = []
+        if self._tw_auth:
+            posters.append(("Twitter", self._post_twitter))
+        if self.discord_url:
+            posters.append(("Discord", self._post_discord))
+        if not posters:
+            return False
+
+        posted_successfully = False
+        with ThreadPoolExecutor(max_workers=len(posters)) as ex:
+            futures = [(name, ex.submit(poster, text)) for name, poster in posters]
+            for name, fut in futures:
+                try:
+                    fut.result()
+                    posted_successfully = True
+                except RuntimeError as e:
+                    logger.error("%sへの投稿に失敗しました: %s", name, e)
+        return posted_successfully
+
     def _format_text(self, msg: SignalMessage) -> str:
         base = f"{msg.side}: {msg.symbol} x{msg.qty} @{msg.price:.2f}"
         if msg.comment:
@@ -105,8 +167,12 @@ class SNSNotifier:
     def _post_twitter(self, text: str) -> None:
         """X v2 API でツイート"""
         payload = {"text": text}
-        resp = requests.post(
-            TWITTER_API_URL, auth=self._tw_auth, json=payload, timeout=REQUEST_TIMEOUT
+        resp = self._session.post(
+            TWITTER_API_URL,
+            auth=self._tw_auth,
+            data=_dumps(payload),
+            headers=JSON_HEADERS,
+            timeout=REQUEST_TIMEOUT,
         )
         if resp.status_code >= 400:
             raise RuntimeError(f"Twitter post failed: {resp.text}")
@@ -114,10 +180,10 @@ class SNSNotifier:
 
     def _post_discord(self, text: str) -> None:
         """Discord Webhook へ投稿"""
-        resp = requests.post(
+        resp = self._session.post(
             self.discord_url,
-            json={"content": text},
-            headers={"Content-Type": "application/json"},
+            data=_dumps({"content": text}),
+            headers=JSON_HEADERS,
             timeout=REQUEST_TIMEOUT,
         )
         if resp.status_code >= 400:
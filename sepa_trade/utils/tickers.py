@@ -0,0 +1,26 @@
+"""
+tickers.py  ― ティッカー一覧ユーティリティ
+------------------------------------------------
+・1 列 CSV（scripts/download_tickers.py の出力形式）からティッカーを読み込む
+・1 列の ASCII テキストなので pandas は使わず標準ライブラリで処理
+"""
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+
+def load_tickers(path: Path | str) -> list[str]:
+    """
+    1 列 CSV からティッカーを読み込む
+    ・前後の空白を除去して大文字化、空行は読み飛ばす
+    ・先頭行が "Symbol" 見出しなら読み飛ばす
+    ・重複は最初の出現順を保って除去
+    """
+    # 整形・空行除去・重複除去を 1 パスで行う（dict は挿入順を保持）
+    with open(path, newline="") as fh:
+        symbols = (row[0].strip().upper() for row in csv.reader(fh) if row)
+        tickers = list(dict.fromkeys(sym for sym in symbols if sym))
+    if tickers and tickers[0] == "SYMBOL":
+        del tickers[0]
+    return tickers
@@ -1,26 +1,313 @@
 """
 timeframe.py  ― データ整形ユーティリティ
 ------------------------------------------------
-・yfinance から日足を取得（調整済み・イベント行なし）
+・yfinance から日足を取得（調整済み・イベント行なし、複数銘柄は一括取得）
+・Yahoo の spark エンドポイントから複数銘柄の終値だけを一括取得
 ・日足 Series → 週足 DataFrame(列は "Close") に変換
 """
 from __future__ import annotations
+
+import datetime as dt
+import functools
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
+import requests
 import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+try:
+    from joblib import Memory
+except ImportError:  # joblib なしの場合はディスクキャッシュを使わない
+    Memory = None
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DOWNLOAD_BATCH_SIZE = 20  # 1 リクエストに束ねる銘柄数
+
+# spark エンドポイント（1 リクエストで最大 20 銘柄の終値を返す）
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_TIMEOUT = 10
+SPARK_HEADERS = {"User-Agent": "Mozilla/5.0"}  # UA なしだと 429 を返されやすい
+
+# load_daily のディスクキャッシュ（直近に引けたセッション単位で保持）
+CACHE_DIR = ".cache/yf"
+CACHE_BYTES_LIMIT = "500M"              # キャッシュ全体の上限サイズ
+CACHE_MAX_AGE = dt.timedelta(days=7)    # これより古いエントリは削除
+_memory = Memory(location=CACHE_DIR, verbose=0) if Memory is not None else None
+
+# 米国市場の引け（確定値が反映されるまでの余裕を 30 分みる）
+MARKET_TZ = "America/New_York"
+MARKET_CLOSE = dt.time(16, 30)
+
+# daily_to_weekly_cached 用の LRU キャッシュ
+WEEKLY_CACHE_SIZE = 128
+_weekly_cache: OrderedDict[tuple, tuple[object, pd.DataFrame]] = OrderedDict()
 
 
 def load_daily(ticker: str, years: int = 5) -> pd.DataFrame:
-    """調整済み OHLCV を日足で取得（配当・分割行を除外）"""
-    df = yf.download(
-        ticker,
-        period=f"{years}y",
-        auto_adjust=True,   # 調整済み価格のみ
-        actions=False,      # 配当 / 分割行を含めない
-        progress=False,
+    """
+    調整済み OHLCV を日足で取得（配当・分割行を除外）
+    ・joblib があれば (ticker, years, 直近に引けたセッション日) 単位で CACHE_DIR にキャッシュ
+    ・場中の未確定バーを含む取得結果はキャッシュしない
+    """
+    _prune_cache()
+    session = _last_completed_session().isoformat()
+    try:
+        return _load_daily_cached(ticker, years, session)
+    except _EmptyDownload:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    except _OpenSession as e:
+        return e.df
+
+
+class _EmptyDownload(Exception):
+    """取得結果が空だったことを示す（例外にすることで失敗をキャッシュさせない）"""
+
+
+class _OpenSession(Exception):
+    """未確定のセッションのバーを含むことを示す（取得結果は df に保持し、キャッシュさせない）"""
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        super().__init__()
+        self.df = df
+
+
+def _last_completed_session(now: pd.Timestamp | None = None) -> dt.date:
+    """
+    米国市場で直近に引けたセッションの日付
+    ・ローカル日付ではなくニューヨーク時間で判定（JST では場が日付をまたぐため）
+    ・祝日は考慮せず平日で近似（祝日は前の営業日のデータがそのまま返るだけ）
+    """
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else now.tz_convert(MARKET_TZ)
+    day = now.date()
+    if now.weekday() < 5 and now.time() < MARKET_CLOSE:
+        day -= dt.timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= dt.timedelta(days=1)
+    return day
+
+
+@functools.lru_cache(maxsize=None)
+def _prune_cache() -> None:
+    """ディスクキャッシュのサイズと期限を制限する（プロセスごとに一度だけ実行）"""
+    if _memory is not None:
+        _memory.reduce_size(bytes_limit=CACHE_BYTES_LIMIT, age_limit=CACHE_MAX_AGE)
+
+
+def _load_daily_uncached(ticker: str, years: int, session: str) -> pd.DataFrame:
+    """load_daily の実体。session（直近に引けたセッション日）はキャッシュキーとしてのみ使う"""
+    df = load_daily_many([ticker], years)[ticker]
+    if df.empty:
+        raise _EmptyDownload(ticker)
+    if df.index[-1].date() > dt.date.fromisoformat(session):
+        raise _OpenSession(df)
+    return df
+
+
+_load_daily_cached = (
+    _memory.cache(_load_daily_uncached) if _memory is not None else _load_daily_uncached
+)
+
+
+def load_daily_many(
+    tickers: list[str],
+    years: int = 5,
+    threads: bool | int = True,
+) -> dict[str, pd.DataFrame]:
+    """
+    複数銘柄の調整済み OHLCV を日足でまとめて取得
+    ・DOWNLOAD_BATCH_SIZE 銘柄ずつ 1 リクエストに束ねる（Yahoo の URL 上限）
+    ・返り値は {ティッカー: OHLCV DataFrame}。取得できなかった銘柄は空の DataFrame
+    ・threads は yf.download にそのまま渡す
+    """
+    result: dict[str, pd.DataFrame] = {}
+    for i in range(0, len(tickers), DOWNLOAD_BATCH_SIZE):
+        batch = tickers[i:i + DOWNLOAD_BATCH_SIZE]
+        df = yf.download(
+            " ".join(batch),
+            period=f"{years}y",
+            auto_adjust=True,   # 調整済み価格のみ
+            actions=False,      # 配当 / 分割行を含めない
+            group_by="ticker",  # 列を (ティッカー, 項目) の MultiIndex にする
+            threads=threads,
+            progress=False,
+        )
+        # auto_adjust=True は既に 'Close' 列を調整済み価格として提供するため、
+        # 'Adj Close' からのリネームは不要。
+        for sym in batch:
+            result[sym] = _split_ticker_frame(df, sym)
+    return result
+
+
+def load_daily_concurrent(
+    tickers: list[str],
+    years: int = 5,
+    max_workers: int = 8,
+) -> dict[str, pd.DataFrame | None]:
+    """
+    load_daily を銘柄ごとにスレッドで並列実行
+    ・一括取得できないケース（銘柄ごとに条件が異なる等）向け
+    ・通信待ちが支配的なので、スレッドでも max_workers 倍近く速くなる
+    ・失敗した銘柄はログに残して None を返す（1 銘柄の失敗で全体を止めない）
+    """
+    result: dict[str, pd.DataFrame | None] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(load_daily, t, years): t for t in tickers}
+        for fut in as_completed(futures):
+            ticker = futures[fut]
+            try:
+                result[ticker] = fut.result()
+            except Exception:
+                logger.error("[%s] 日足データの取得に失敗しました。", ticker, exc_info=True)
+                result[ticker] = None
+    return result
+
+
+def load_closes_spark(
+    tickers: list[str],
+    range_: str = "1y",
+    interval: str = "1d",
+    max_workers: int = 8,
+) -> dict[str, pd.Series]:
+    """
+    spark エンドポイントで複数銘柄の終値だけを一括取得（スクリーナーの起動時向け）
+    ・DOWNLOAD_BATCH_SIZE 銘柄ずつ 1 リクエストに束ね、バッチはスレッドで並列実行
+    ・Session を共有して HTTP keep-alive で TLS ハンドシェイクを使い回す
+    ・返り値は {ティッカー: 終値 Series}。取得できなかった銘柄は空の Series
+    """
+    batches = [
+        tickers[i:i + DOWNLOAD_BATCH_SIZE]
+        for i in range(0, len(tickers), DOWNLOAD_BATCH_SIZE)
+    ]
+    result: dict[str, pd.Series] = {}
+    with requests.Session() as session:
+        session.headers.update(SPARK_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount("https://", adapter)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            futures = {
+                ex.submit(_fetch_spark_batch, session, batch, range_, interval): batch
+                for batch in batches
+            }
+            for fut in as_completed(futures):
+                try:
+                    result.update(fut.result())
+                except Exception:
+                    logger.error(
+                        "spark での終値取得に失敗しました: %s",
+                        ",".join(futures[fut]), exc_info=True,
+                    )
+
+    empty = pd.Series(dtype=np.float64, name="Close")
+    return {t: result.get(t, empty) for t in tickers}
+
+
+def _fetch_spark_batch(
+    session: requests.Session,
+    batch: list[str],
+    range_: str,
+    interval: str,
+) -> dict[str, pd.Series]:
+    """spark エンドポイントに 1 バッチ分を問い合わせ、銘柄ごとの終値 Series に分解"""
+    res = session.get(
+        SPARK_URL,
+        params={
+            "symbols": ",".join(batch),
+            "range": range_,
+            "interval": interval,
+            "indicators": "close",
+        },
+        timeout=SPARK_TIMEOUT,
     )
-    # auto_adjust=True は既に 'Close' 列を調整済み価格として提供するため、
-    # 'Adj Close' からのリネームは不要。
-    return df[["Open", "High", "Low", "Close", "Volume"]]
+    res.raise_for_status()
+    return _parse_spark(res.json())
+
+
+def _parse_spark(payload: dict) -> dict[str, pd.Series]:
+    """
+    spark の JSON を {ティッカー: 終値 Series} に変換
+    ・{"spark": {"result": [...]}} 形式と、銘柄をキーにした平坦な形式の両方に対応
+    ・タイムスタンプは取引所の現地日付に揃える（load_daily の日付インデックスと同じ）
+    ・壊れたエントリ（銘柄名なし・空配列・長さ不一致など）はバッチごと落とさず、その銘柄だけ読み飛ばす
+    """
+    if "spark" in payload:
+        entries = []
+        for item in (payload["spark"] or {}).get("result") or []:
+            symbol = item.get("symbol") if isinstance(item, dict) else None
+            if not symbol:
+                continue
+            for resp in item.get("response") or []:
+                if not isinstance(resp, dict):
+                    continue
+                quote = ((resp.get("indicators") or {}).get("quote") or [{}])[0] or {}
+                entries.append((
+                    symbol,
+                    resp.get("timestamp") or [],
+                    quote.get("close") or [],
+                    (resp.get("meta") or {}).get("gmtoffset") or 0,
+                ))
+    else:
+        entries = [
+            (sym, data.get("timestamp") or [], data.get("close") or [], 0)
+            for sym, data in payload.items()
+            if isinstance(data, dict)
+        ]
+
+    result: dict[str, pd.Series] = {}
+    for sym, timestamps, closes, gmtoffset in entries:
+        if not timestamps or len(timestamps) != len(closes):
+            logger.debug("spark の %s は終値が空または長さ不一致のため skip", sym)
+            continue
+        try:
+            seconds = np.asarray(timestamps, dtype=np.int64) + int(gmtoffset)
+            # 取引停止日などは null で返るので NaN に変換
+            values = np.asarray(closes, dtype=np.float64)
+        except (TypeError, ValueError):
+            logger.debug("spark の %s は値を数値に変換できないため skip", sym)
+            continue
+        index = pd.to_datetime(seconds, unit="s").normalize()
+        result[sym] = pd.Series(values, index=index, name="Close")
+    return result
+
+
+def _split_ticker_frame(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """yf.download(group_by="ticker") の結果から 1 銘柄分の OHLCV を切り出す"""
+    if isinstance(df.columns, pd.MultiIndex):
+        symbols = df.columns.get_level_values(0)
+        key = ticker if ticker in symbols else ticker.upper()
+        if key not in symbols:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        df = df[key]
+    elif df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    # 一括取得では銘柄ごとに上場期間が異なるため、全列 NaN の行を落とす
+    df = df[OHLCV_COLUMNS].dropna(how="all")
+    df["Volume"] = _compact_volume(df["Volume"])
+    return df
+
+
+def _compact_volume(volume: pd.Series) -> pd.Series:
+    """
+    出来高を uint32 に縮めてメモリ帯域を半減させる
+    ・欠損・負値・小数・uint32 の上限超えを含む場合は元の dtype のまま返す
+    """
+    values = volume.to_numpy()
+    if values.size == 0 or values.dtype.kind not in "iuf":
+        return volume
+    if (
+        np.isnan(values).any()
+        or values.min() < 0
+        or values.max() > np.iinfo(np.uint32).max
+        or (values.dtype.kind == "f" and not (values == np.floor(values)).all())
+    ):
+        return volume
+    return volume.astype(np.uint32)
 
 
 def daily_to_weekly(daily_data: pd.DataFrame | pd.Series) -> pd.DataFrame:
@@ -39,20 +326,100 @@ def daily_to_weekly(daily_data: pd.DataFrame | pd.Series) -> pd.DataFrame:
     else:
         raise TypeError("入力はpandasのDataFrameまたはSeriesである必要があります。")
 
+    index = close_series.index
+    if (
+        not isinstance(index, pd.DatetimeIndex)
+        or index.tz is not None
+        or len(index) == 0
+    ):
+        # NumPy 版の前提を満たさない入力は pandas の resample で処理
+        weekly = (
+            close_series.resample("W-FRI").last()  # 金曜終値
+                       .ffill()                    # 欠損補完
+                       .iloc[:-1]                  # 未確定週を除外
+                       .to_frame("Close")
+        )
+        return weekly
+
+    if not index.is_monotonic_increasing:
+        close_series = close_series.sort_index()
+
     weekly = (
-        close_series.resample("W-FRI").last()  # 金曜終値
-                   .ffill()                    # 欠損補完
-                   .iloc[:-1]                  # 未確定週を除外
-                   .to_frame("Close")
+        _resample_friday_last(close_series)  # 金曜終値 + 欠損補完
+        .iloc[:-1]                           # 未確定週を除外
+        .to_frame("Close")
+    )
+    return weekly
+
+
+def _resample_friday_last(close_series: pd.Series) -> pd.Series:
+    """
+    ``resample("W-FRI").last().ffill()`` と同じ結果を NumPy だけで計算する。
+    日付を「金曜締めの週番号」に変換し、週番号が切り替わる直前の行を週末値とする。
+    入力はタイムゾーンなし・昇順の DatetimeIndex を前提とする。
+    """
+    index = close_series.index
+    days = index.values.astype("datetime64[D]").view("i8")
+    # 1970-01-02(金) が週番号 0 の週末。土曜から翌週番号に切り替わる
+    week = (days + 5) // 7
+    first_week = week[0]
+    n_weeks = int(week[-1] - first_week) + 1
+
+    values = close_series.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)  # resample().last() は NaN を飛ばす
+    week_pos = week[valid] - first_week
+    valid_values = values[valid]
+
+    weekly = np.full(n_weeks, np.nan)
+    if week_pos.size:
+        last_rows = np.append(np.flatnonzero(np.diff(week_pos)), week_pos.size - 1)
+        weekly[week_pos[last_rows]] = valid_values[last_rows]
+
+    # 前方補完: 直近の有効値の位置を累積最大で求める（空き週がなければ省略）
+    gaps = np.isnan(weekly)
+    if gaps.any():
+        src = np.where(gaps, -1, np.arange(n_weeks))
+        np.maximum.accumulate(src, out=src)
+        weekly = np.where(src >= 0, weekly[src], np.nan)
+
+    fridays = ((np.arange(n_weeks) + first_week) * 7 + 1).astype("datetime64[D]")
+    weekly_index = pd.DatetimeIndex(
+        fridays.astype(index.dtype), freq="W-FRI", name=index.name
     )
+    return pd.Series(weekly, index=weekly_index, name=close_series.name)
+
+def daily_to_weekly_cached(daily_data: pd.DataFrame | pd.Series) -> pd.DataFrame:
+    """
+    daily_to_weekly のメモ化版（LRU, 最大 WEEKLY_CACHE_SIZE 件）
+    ・キーは (入力オブジェクトの id, 行数, 最終日付)
+      新しい日足行が追加されれば行数・最終日付が変わり再計算される
+    ・入力はキャッシュ内で参照を保持するため、id が別オブジェクトに再利用されることはない
+    ・入力を同じ長さのままインプレースで書き換えた場合は検出できない
+    ・返り値はキャッシュと共有されるので、呼び出し側で変更しないこと
+    """
+    last_date = daily_data.index[-1] if len(daily_data) else None
+    key = (id(daily_data), len(daily_data), last_date)
+
+    cached = _weekly_cache.get(key)
+    if cached is not None:
+        _weekly_cache.move_to_end(key)
+        return cached[1]
+
+    weekly = daily_to_weekly(daily_data)
+    _weekly_cache[key] = (daily_data, weekly)
+    if len(_weekly_cache) > WEEKLY_CACHE_SIZE:
+        _weekly_cache.popitem(last=False)
     return weekly
 
+
 def debug_print_weekly_ma(ticker: str, weekly: pd.DataFrame) -> None:
     """
     デバッグ専用：直近 5 週の Close / ma30 / ma40 を表示
     """
-    ma30 = weekly["Close"].rolling(30).mean()
-    ma40 = weekly["Close"].rolling(40).mean()
+    # 表示する 5 週分の ma40 に必要な末尾 40 + 5 - 1 = 44 週だけで計算する
+    tail = weekly[["Close"]].iloc[-44:]
+    ma30 = tail["Close"].rolling(30).mean()
+    ma40 = tail["Close"].rolling(40).mean()
     print(f"\n[{ticker}] 直近 5 週")
-    debug_df = weekly.assign(ma30=ma30, ma40=ma40)
+    debug_df = tail.assign(ma30=ma30, ma40=ma40)
     print(debug_df.tail(5)[["Close", "ma30", "ma40"]].to_string())
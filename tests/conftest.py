@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+CONTRACTION_BARS = 5  # ブレイクアウト前に収縮させる日数（shrink_steps の上限の目安）
+
+
+def _build_vcp_df(
+    periods: int = 65,
+    pivot: float = 100.0,
+    initial_width: float = 12.0,
+    contraction_rate: float = 0.4,
+    breakout: bool = True,
+    high_volume: bool = True,
+) -> pd.DataFrame:
+    """
+    VCPパターンのDataFrameを生成するヘルパー関数。
+    デフォルトでは、VCPStrategyのデフォルトパラメータを通過するデータを生成する。
+    """
+    idx = pd.date_range(end="2025-07-11", periods=periods, freq="B")
+    vol_base = 1_000
+
+    # レンジ幅: 直近 CONTRACTION_BARS 日だけ等比数列で収縮させ、それ以前は一定
+    # （全期間で収縮させると float32 でレンジが 0 に潰れ、収縮判定が成立しない）
+    base = periods - 1
+    steps = np.clip(np.arange(periods) - (base - CONTRACTION_BARS), 0, None)
+    widths = initial_width * contraction_rate ** steps
+
+    # 最終日（判定日）のデータ
+    if breakout:
+        last_high, last_close = pivot * 1.015, pivot * 1.01
+    else:
+        last_high, last_close = pivot, pivot - widths[base] / 2
+    last_vol = vol_base * 3 if high_volume else vol_base
+
+    # 最終 dtype の配列を確保してスライス代入で埋める（中間配列を作らない）
+    highs = np.empty(periods)
+    lows = np.empty(periods)
+    closes = np.empty(periods)
+    vols = np.empty(periods, dtype=np.uint32)  # 出来高は非負なので uint32
+
+    highs[:base] = pivot
+    lows[:base] = pivot - widths[:base]
+    closes[:base] = pivot - widths[:base] / 2
+    vols[:base] = vol_base
+
+    highs[base] = last_high
+    lows[base] = pivot  # 最終日の安値はピボット価格
+    closes[base] = last_close
+    vols[base] = last_vol
+
+    return pd.DataFrame(
+        {"High": highs, "Low": lows, "Close": closes, "Volume": vols},
+        index=idx,
+        copy=False,
+    )
+
+
+@pytest.fixture(scope="session")
+def vcp_df_factory():
+    """
+    VCPパターンの DataFrame を返すファクトリ（セッション内でメモ化）。
+    同じパラメータでの再構築を避けるため、返した DataFrame は変更しないこと。
+    """
+    cache = {}
+
+    def make(**kwargs) -> pd.DataFrame:
+        key = tuple(sorted(kwargs.items()))
+        if key not in cache:
+            cache[key] = _build_vcp_df(**kwargs)
+        return cache[key]
+
+    return make
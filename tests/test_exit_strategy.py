@@ -1,20 +1,33 @@
+import numpy as np
 import pytest
 import pandas as pd
-from sepa_trade.strategy.exit_rules import ExitStrategy
+from sepa_trade.strategy.exit_rules import ExitStrategy, latest_atr10
 
 
-def create_test_df(periods: int = 20) -> pd.DataFrame:
+def _build_test_df(periods: int) -> pd.DataFrame:
     """
-    テスト用のOHLCV DataFrameを生成するヘルパー関数。
-    デフォルトでは安定した上昇トレンドのデータを生成する。
+    テスト用のOHLCV DataFrameを生成する。
+    安定した上昇トレンドのデータを生成する。
     """
     dates = pd.date_range(end="2025-07-11", periods=periods, freq="B")
-    close = pd.Series([100 + i for i in range(periods)], index=dates, name="Close")
+    close = pd.Series(100.0 + np.arange(periods), index=dates, name="Close")
     high = close * 1.01
     low = close * 0.99
     return pd.DataFrame({"High": high, "Low": low, "Close": close})
 
 
+# 既定サイズのデータはモジュール読み込み時に一度だけ構築する
+_BASE_DF = _build_test_df(20)
+
+
+def create_test_df(periods: int = 20) -> pd.DataFrame:
+    """
+    テスト用のOHLCV DataFrameを返すヘルパー関数。
+    既定サイズは共有データのコピーを返すので、呼び出し側で書き換えてよい。
+    """
+    return _BASE_DF.copy() if periods == 20 else _build_test_df(periods)
+
+
 def test_exit_strategy_ema_cross_true():
     """終値が10EMAを下回った場合にema_cross()がTrueを返すことを確認。"""
     df = create_test_df()
@@ -26,8 +39,8 @@ def test_exit_strategy_ema_cross_true():
 
 def test_exit_strategy_ema_cross_false():
     """終値が10EMAを上回っている場合にema_cross()がFalseを返すことを確認。"""
-    df = create_test_df()  # 安定した上昇トレンド
-    strat = ExitStrategy(df, entry_price=110)
+    # 安定した上昇トレンド（書き換えないので共有データをそのまま使う）
+    strat = ExitStrategy(_BASE_DF, entry_price=110)
     assert strat.ema_cross() is False
 
 
@@ -36,13 +49,12 @@ def test_exit_strategy_atr_trail_true():
     df = create_test_df()
     entry_price = 115.0
 
-    # 損切りラインを計算するために一度インスタンス化
-    temp_strat = ExitStrategy(df.copy(), entry_price)
-    latest_atr = temp_strat.df["ATR10"].iloc[-1]
-    stop_price = entry_price - latest_atr * 1.5
+    # 最終日の安値を急落させる（安値を下げると真の値幅も広がり ATR も上がる）
+    df.iloc[-1, df.columns.get_loc("Low")] = df["Close"].iloc[-1] * 0.9
 
-    # 最終日の安値を損切りラインより下に設定
-    df.iloc[-1, df.columns.get_loc("Low")] = stop_price - 0.01
+    # 損切りラインは書き換え後のデータの ATR で計算する
+    stop_price = entry_price - latest_atr10(df) * 1.5
+    assert df["Low"].iloc[-1] < stop_price
 
     strat = ExitStrategy(df, entry_price)
     assert strat.atr_trail() is True
@@ -50,9 +62,8 @@ def test_exit_strategy_atr_trail_true():
 
 def test_exit_strategy_atr_trail_false():
     """安値がATR損切りラインを上回っている場合にatr_trail()がFalseを返すことを確認。"""
-    df = create_test_df()
     # エントリー価格が高くても、価格が下落しなければ損切りにはかからない
-    strat = ExitStrategy(df, entry_price=118.0)
+    strat = ExitStrategy(_BASE_DF, entry_price=118.0)
     assert strat.atr_trail() is False
 
 
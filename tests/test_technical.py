@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from sepa_trade.technical import TrendTemplate, screen_many
+
+
+def create_close_matrix(periods: int = 300) -> np.ndarray:
+    """
+    合格・不合格が混在する複数銘柄の終値行列 (銘柄数, 日数) を生成するヘルパー関数。
+    """
+    rng = np.random.default_rng(42)
+    t = np.arange(periods)
+    rows = [
+        np.linspace(50, 150, periods),                       # 理想的な上昇トレンド
+        np.linspace(150, 50, periods),                       # 下降トレンド
+        np.full(periods, 100.0),                             # 横ばい
+        100 + 20 * np.sin(t / 20),                           # レンジ相場
+        np.linspace(50, 150, periods) * (1 + 0.01 * rng.standard_normal(periods)),
+        np.r_[np.linspace(50, 150, periods - 10), np.full(10, 90.0)],  # 直近で急落
+    ]
+    return np.vstack(rows)
+
+
+def test_screen_many_matches_trend_template():
+    """screen_many の結果が銘柄ごとの TrendTemplate.passes() と一致することを確認。"""
+    closes = create_close_matrix()
+    idx = pd.date_range(end="2025-07-11", periods=closes.shape[1], freq="B")
+
+    expected = [
+        TrendTemplate(pd.DataFrame({"Close": row}, index=idx)).passes()
+        for row in closes
+    ]
+    result = screen_many(closes)
+
+    assert result.dtype == bool
+    assert result.tolist() == expected
+    assert result[0]  # 理想的な上昇トレンドは合格
+
+
+def test_screen_many_fails_on_insufficient_data():
+    """データが252日未満の場合にすべて不合格になることを確認。"""
+    closes = create_close_matrix(periods=251)
+    assert not screen_many(closes).any()
+
+
+def test_trend_template_rejects_nan_rs_rating():
+    """RSレーティングが NaN の場合は不合格になることを確認。"""
+    closes = create_close_matrix()
+    idx = pd.date_range(end="2025-07-11", periods=closes.shape[1], freq="B")
+    template = TrendTemplate(pd.DataFrame({"Close": closes[0]}, index=idx))
+    assert template.passes(rs_rating=80)
+    assert not template.passes(rs_rating=float("nan"))
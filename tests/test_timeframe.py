@@ -0,0 +1,167 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+from sepa_trade.utils.timeframe import (
+    _last_completed_session,
+    _parse_spark,
+    daily_to_weekly,
+)
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        ("2025-07-11 15:00", "2025-07-10"),  # 金曜の場中 → 木曜
+        ("2025-07-11 17:00", "2025-07-11"),  # 金曜の引け後 → 金曜
+        ("2025-07-12 10:00", "2025-07-11"),  # 土曜 → 金曜
+        ("2025-07-14 09:00", "2025-07-11"),  # 月曜の寄り前 → 金曜
+    ],
+)
+def test_last_completed_session(now, expected):
+    """キャッシュキーが直近に引けた米国セッションの日付になることを確認。"""
+    now = pd.Timestamp(now, tz="America/New_York")
+    assert _last_completed_session(now) == dt.date.fromisoformat(expected)
+
+
+def test_last_completed_session_uses_new_york_time():
+    """ローカル日付ではなくニューヨーク時間で判定することを確認（JST では日付をまたぐ）。"""
+    # JST 7/15 01:00 = NY 7/14 12:00（月曜の場中）→ 直近の引けは金曜
+    now = pd.Timestamp("2025-07-15 01:00", tz="Asia/Tokyo")
+    assert _last_completed_session(now) == dt.date(2025, 7, 11)
+
+
+def _daily_close(periods: int = 300) -> pd.Series:
+    """乱数で作った営業日ベースの日足終値"""
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2024-01-02", periods=periods, name="Date")
+    return pd.Series(100 + rng.standard_normal(periods).cumsum(), index=index, name="Close")
+
+
+def _with_nan_rows(close: pd.Series) -> pd.Series:
+    close = close.copy()
+    close.iloc[[3, 4, 50, -1]] = np.nan   # 週の途中・週末・最終行
+    close.iloc[100:105] = np.nan          # 1 週間まるごと NaN
+    return close
+
+
+def _with_empty_weeks(close: pd.Series) -> pd.Series:
+    return close.drop(close.index[60:75])  # 3 週分の行がない
+
+
+def _unsorted(close: pd.Series) -> pd.Series:
+    rng = np.random.default_rng(1)
+    return close.iloc[rng.permutation(len(close))]
+
+
+def _second_unit(close: pd.Series) -> pd.Series:
+    return close.set_axis(close.index.as_unit("s"))
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [
+        pytest.param(lambda close: close, id="plain"),
+        pytest.param(_with_nan_rows, id="nan_rows"),
+        pytest.param(_with_empty_weeks, id="empty_weeks"),
+        pytest.param(_unsorted, id="unsorted"),
+        pytest.param(_second_unit, id="second_unit"),
+        pytest.param(lambda close: _second_unit(_with_empty_weeks(_with_nan_rows(close))), id="combined"),
+    ],
+)
+def test_daily_to_weekly_matches_pandas_resample(transform):
+    """NumPy 版の週足変換が resample("W-FRI").last().ffill().iloc[:-1] と一致することを確認。"""
+    close = transform(_daily_close())
+    expected = close.resample("W-FRI").last().ffill().iloc[:-1].to_frame("Close")
+
+    pd.testing.assert_frame_equal(daily_to_weekly(close), expected, check_freq=False)
+    pd.testing.assert_frame_equal(
+        daily_to_weekly(close.to_frame()), expected, check_freq=False
+    )
+
+
+def _epoch(ts: str) -> int:
+    return int(pd.Timestamp(ts, tz="UTC").timestamp())
+
+
+# 米国東部夏時間の 20:00 は UTC では翌日 00:00 になる
+SPARK_TIMESTAMPS = [
+    _epoch("2025-07-10 00:00"), _epoch("2025-07-11 00:00"), _epoch("2025-07-12 00:00")
+]
+SPARK_DATES = pd.DatetimeIndex(["2025-07-09", "2025-07-10", "2025-07-11"])
+
+
+@pytest.mark.parametrize(
+    "payload, dates",
+    [
+        pytest.param(
+            {
+                "spark": {
+                    "result": [
+                        {
+                            "symbol": "AAPL",
+                            "response": [
+                                {
+                                    "meta": {"gmtoffset": -14400},
+                                    "timestamp": SPARK_TIMESTAMPS,
+                                    "indicators": {"quote": [{"close": [210.0, None, 212.5]}]},
+                                }
+                            ],
+                        },
+                        {"symbol": "NODATA", "response": []},
+                    ]
+                }
+            },
+            SPARK_DATES,
+            id="spark_result",
+        ),
+        pytest.param(
+            {
+                "AAPL": {"timestamp": SPARK_TIMESTAMPS, "close": [210.0, None, 212.5]},
+                "error": None,
+            },
+            SPARK_DATES + pd.Timedelta(days=1),  # gmtoffset がないので UTC 日付のまま
+            id="flat",
+        ),
+    ],
+)
+def test_parse_spark(payload, dates):
+    """spark の 2 形式を日付インデックスの終値 Series に変換できることを確認。"""
+    result = _parse_spark(payload)
+
+    assert list(result) == ["AAPL"]
+    expected = pd.Series([210.0, np.nan, 212.5], index=dates, name="Close")
+    pd.testing.assert_series_equal(
+        result["AAPL"], expected, check_index_type=False, check_freq=False
+    )
+
+
+def test_parse_spark_skips_malformed_entries():
+    """壊れたエントリはその銘柄だけ読み飛ばし、残りの銘柄は変換できることを確認。"""
+    good = {
+        "meta": {"gmtoffset": -14400},
+        "timestamp": SPARK_TIMESTAMPS,
+        "indicators": {"quote": [{"close": [210.0, None, 212.5]}]},
+    }
+    payload = {
+        "spark": {
+            "result": [
+                {"response": [good]},                                   # 銘柄名なし
+                {"symbol": "EMPTY", "response": [{"timestamp": None}]},  # 空配列
+                {
+                    "symbol": "SHORT",                                    # 長さ不一致
+                    "response": [dict(good, indicators={"quote": [{"close": [1.0]}]})],
+                },
+                {
+                    "symbol": "TEXT",                                     # 数値に変換できない
+                    "response": [dict(good, indicators={"quote": [{"close": ["x", 1.0, 2.0]}]})],
+                },
+                {"symbol": "AAPL", "response": [good]},
+            ]
+        }
+    }
+    result = _parse_spark(payload)
+
+    assert list(result) == ["AAPL"]
+    assert result["AAPL"].index.equals(SPARK_DATES)
@@ -1,57 +1,12 @@
-import pytest
 import numpy as np
 import pandas as pd
+import pytest
 from sepa_trade.strategy.vcp_breakout import VCPStrategy, BreakoutSignal
 
 
-def build_vcp_df(
-    periods: int = 65,
-    pivot: float = 100.0,
-    initial_width: float = 12.0,
-    contraction_rate: float = 0.4,
-    breakout: bool = True,
-    high_volume: bool = True,
-) -> pd.DataFrame:
-    """
-    VCPパターンのDataFrameを生成するヘルパー関数。
-    デフォルトでは、VCPStrategyのデフォルトパラメータを通過するデータを生成する。
-    """
-    idx = pd.date_range(end="2025-07-11", periods=periods, freq="B")
-    vol_base = 1_000
-
-    highs, lows, closes, vols = [], [], [], []
-    width = initial_width
-    # ブレイクアウト日を除く期間のデータを生成
-    for _ in range(periods - 1):
-        highs.append(pivot)
-        lows.append(pivot - width)
-        closes.append(pivot - width / 2)
-        vols.append(vol_base)
-        width *= contraction_rate
-
-    # 最終日（判定日）のデータを生成
-    if breakout:
-        highs.append(pivot * 1.015)
-        closes.append(pivot * 1.01)
-    else:
-        highs.append(pivot)
-        closes.append(pivot - width / 2)
-
-    lows.append(pivot)  # 最終日の安値はピボット価格
-
-    if high_volume:
-        vols.append(vol_base * 3)
-    else:
-        vols.append(vol_base)
-
-    return pd.DataFrame(
-        {"High": highs, "Low": lows, "Close": closes, "Volume": vols}, index=idx
-    )
-
-
-def test_vcp_strategy_passes_on_ideal_data():
+def test_vcp_strategy_passes_on_ideal_data(vcp_df_factory):
     """理想的なVCPブレイクアウトデータが正しく検出されることを確認。"""
-    df = build_vcp_df()
+    df = vcp_df_factory()
     # デフォルトパラメータでVCPStrategyをテスト
     strat = VCPStrategy(df, shrink_steps=2, shrink_ratio=0.5, volume_ratio=1.5)
     flag, signal = strat.check_today()
@@ -63,38 +18,110 @@ def test_vcp_strategy_passes_on_ideal_data():
     assert signal.atr > 0
 
 
-def test_vcp_strategy_fails_on_insufficient_data():
-    """データが60日未満の場合に不合格になることを確認。"""
-    df = build_vcp_df(periods=59)
+@pytest.mark.parametrize(
+    "build_kwargs, relaxed",
+    [
+        pytest.param({"periods": 59}, None, id="insufficient_data"),     # データが60日未満
+        pytest.param({"breakout": False}, None, id="no_breakout"),       # ピボットをブレイクしない
+        # 出来高が不足（出来高倍率を 1.0 に緩めれば合格する）
+        pytest.param({"high_volume": False}, {"volume_ratio": 1.0}, id="low_volume"),
+        # 収縮率をVCPStrategyのデフォルト(0.5)より大きい0.85に設定（収縮判定を外せば合格する）
+        pytest.param({"contraction_rate": 0.85}, {"shrink_steps": 0}, id="no_contraction"),
+    ],
+)
+def test_vcp_strategy_fails(vcp_df_factory, build_kwargs, relaxed):
+    """VCPの条件を1つでも満たさないデータが不合格になることを確認。"""
+    df = vcp_df_factory(**build_kwargs)
     strat = VCPStrategy(df)
     flag, signal = strat.check_today()
     assert flag is False
     assert signal is None
 
+    # 狙った条件だけが原因で不合格になっていることを確認
+    if relaxed is not None:
+        assert VCPStrategy(df, **relaxed).check_today()[0] is True
 
-def test_vcp_strategy_fails_on_no_breakout():
-    """価格がピボットをブレイクしない場合に不合格になることを確認。"""
-    df = build_vcp_df(breakout=False)
-    strat = VCPStrategy(df)
+
+@pytest.mark.parametrize("nan_pos", [-1, -5], ids=["breakout_day", "in_window"])
+def test_vcp_strategy_rejects_low_volume_with_nan(vcp_df_factory, nan_pos):
+    """出来高に NaN があっても、出来高不足のブレイクを合格にしないことを確認。"""
+    df = vcp_df_factory(high_volume=False).astype({"Volume": float})  # astype はコピーを返す
+    df.iloc[nan_pos, df.columns.get_loc("Volume")] = np.nan
+    strat = VCPStrategy(df, shrink_steps=0)  # 収縮判定を外してピボット・出来高判定だけを見る
     flag, signal = strat.check_today()
     assert flag is False
     assert signal is None
 
 
-def test_vcp_strategy_fails_on_low_volume():
-    """出来高が不足している場合に不合格になることを確認。"""
-    df = build_vcp_df(high_volume=False)
-    strat = VCPStrategy(df)
+def test_vcp_strategy_volume_average_skips_nan(vcp_df_factory):
+    """直近20日の平均出来高は NaN を除外して計算されることを確認。"""
+    df = vcp_df_factory().astype({"Volume": float})
+    df.iloc[-5, df.columns.get_loc("Volume")] = np.nan
+    strat = VCPStrategy(df, shrink_steps=0)
     flag, signal = strat.check_today()
-    assert flag is False
-    assert signal is None
+    assert flag is True
+    assert isinstance(signal, BreakoutSignal)
 
 
-def test_vcp_strategy_fails_on_no_contraction():
-    """ボラティリティが収縮しない場合に不合格になることを確認。"""
-    # 収縮率をVCPStrategyのデフォルト(0.5)より大きい0.85に設定
-    df = build_vcp_df(contraction_rate=0.85)
-    strat = VCPStrategy(df)  # shrink_ratio=0.5
+def test_vcp_strategy_pivot_skips_nan_high(vcp_df_factory):
+    """ピボット高値の計算で NaN を除外し、ピボット未達のブレイクを合格にしないことを確認。"""
+    df = vcp_df_factory().copy()
+    df.iloc[-11, df.columns.get_loc("High")] = np.nan
+    df.iloc[-1, df.columns.get_loc("Close")] = 100.5  # ピボット 100 × 1.01 = 101 に未達
+    strat = VCPStrategy(df, shrink_steps=0)
     flag, signal = strat.check_today()
     assert flag is False
     assert signal is None
+
+
+def test_vcp_strategy_breakout_price_keeps_float64(vcp_df_factory):
+    """ブレイク価格は float32 に丸めず、終値そのものを返すことを確認。"""
+    df = vcp_df_factory().copy()
+    df.iloc[-1, df.columns.get_loc("Close")] = 101.37
+    strat = VCPStrategy(df, shrink_steps=0)
+    flag, signal = strat.check_today()
+    assert flag is True
+    assert signal.breakout_price == 101.37
+
+
+def _random_ohlcv(periods: int = 300):
+    """ブレイクと出来高急増・出来高欠損がときどき混ざる乱数の日足"""
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.004, 0.02, periods)))
+    spread = close * rng.uniform(0.001, 0.01, periods)
+    volume = rng.integers(500_000, 1_500_000, periods).astype(float)
+    volume[rng.random(periods) < 0.1] *= 3
+    volume[rng.random(periods) < 0.03] = np.nan
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": volume,
+        },
+        index=pd.bdate_range("2024-01-02", periods=periods),
+    )
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param({"shrink_steps": 0}, id="no_contraction_gate"),
+        pytest.param({"shrink_steps": 1, "shrink_ratio": 0.9}, id="loose_contraction"),
+        pytest.param({}, id="default"),
+    ],
+)
+def test_vcp_strategy_check_all_matches_check_today(params):
+    """check_all の各日の判定が、その日までに切り詰めた日足での check_today と一致することを確認。"""
+    df = _random_ohlcv()
+    flags, prices, atrs = VCPStrategy(df, **params).check_all()
+
+    for k in range(1, len(df) + 1):
+        flag, signal = VCPStrategy(df.iloc[:k], **params).check_today()
+        assert flags[k - 1] == flag, k
+        if flag:
+            assert prices[k - 1] == signal.breakout_price
+            assert atrs[k - 1] == signal.atr
+        else:
+            assert np.isnan(prices[k - 1]) and np.isnan(atrs[k - 1])
@@ -1,44 +1,169 @@
+import functools
+
 import pytest
 import numpy as np
 import pandas as pd
 from sepa_trade.technical_weekly import WeeklyTrendTemplate
 
 
+@functools.lru_cache(maxsize=None)
+def _base_prices(periods: int, start_val: float, end_val: float) -> np.ndarray:
+    """線形に上昇する終値配列（共有するので書き換え禁止にしておく）"""
+    prices = np.linspace(start_val, end_val, num=periods)
+    prices.flags.writeable = False
+    return prices
+
+
+# 週足（金曜）の日付インデックスは最大長で一度だけ作り、末尾をスライスして使う
+_MAX_PERIODS = 200
+_WEEKLY_INDEX = pd.date_range(end="2025-07-11", periods=_MAX_PERIODS, freq="W-FRI")
+
+
+def _base_index(periods: int) -> pd.DatetimeIndex:
+    """末尾 periods 週分の日付インデックス"""
+    return _WEEKLY_INDEX[-periods:]
+
+
+def create_passing_prices(periods=60, start_val=100, end_val=200) -> np.ndarray:
+    """
+    デフォルトで WeeklyTrendTemplate のチェックをすべて通過する、
+    線形に上昇する終値配列のコピーを返すヘルパー関数。
+    """
+    return _base_prices(periods, start_val, end_val).copy()
+
+
+def to_weekly_df(close: np.ndarray) -> pd.DataFrame:
+    """終値配列を週足 DataFrame("Close"1列) に包む（配列はコピーしない）。"""
+    return pd.DataFrame({"Close": close}, index=_base_index(len(close)), copy=False)
+
+
+# 理想データ（100→200 を 60 週で線形補間）の最新 10週MA = 直近 10 週の終値の平均
+IDEAL_MA10_LAST = float(_base_prices(60, 100, 200)[-10:].mean())
+
+
 def create_passing_df(periods=60, start_val=100, end_val=200) -> pd.DataFrame:
     """
     デフォルトで WeeklyTrendTemplate のチェックをすべて通過する、
     線形に上昇する株価の DataFrame を作成するヘルパー関数。
     """
-    dates = pd.date_range(end="2025-07-11", periods=periods, freq="W-FRI")
-    close = pd.Series(
-        data=np.linspace(start_val, end_val, num=periods),
-        index=dates,
-        name="Close",
-    )
-    return close.to_frame()
+    return to_weekly_df(create_passing_prices(periods, start_val, end_val))
+
+
+@pytest.fixture(scope="module")
+def ideal_df() -> pd.DataFrame:
+    """理想データの週足 DataFrame（モジュール内で共有するので変更しないこと）。"""
+    return create_passing_df()
 
 
-def test_weekly_template_passes_on_ideal_data():
+@pytest.fixture(scope="module")
+def short_df() -> pd.DataFrame:
+    """52週に 1 週足りない週足 DataFrame（モジュール内で共有）。"""
+    return create_passing_df(periods=51)
+
+
+def test_weekly_template_passes_on_ideal_data(ideal_df):
     """理想的な上昇トレンドのデータがテンプレートを通過することを確認。"""
-    df_weekly = create_passing_df()
-    template = WeeklyTrendTemplate(df_weekly)
+    template = WeeklyTrendTemplate(ideal_df)
+    assert template.passes(rs_rating=80) is True
+
+
+def test_weekly_template_accepts_close_series(ideal_df):
+    """終値 Series を直接渡しても DataFrame と同じ判定になることを確認。"""
+    close = pd.Series(create_passing_prices(), index=ideal_df.index, name="Close", copy=False)
+    template = WeeklyTrendTemplate(close)
     assert template.passes(rs_rating=80) is True
 
 
-def test_weekly_template_fails_on_insufficient_data():
+def test_weekly_template_fails_on_insufficient_data(short_df):
     """データが52週未満の場合にテンプレートが不合格になることを確認。"""
-    df_weekly = create_passing_df(periods=51)
-    template = WeeklyTrendTemplate(df_weekly)
+    template = WeeklyTrendTemplate(short_df)
     assert template.passes(rs_rating=80) is False
 
 
+def test_weekly_template_failed_condition_names_first_failure(ideal_df, short_df):
+    """failed_condition() が passes() と同じ判定で最初の不合格条件名を返すことを確認。"""
+    assert WeeklyTrendTemplate(ideal_df).failed_condition(rs_rating=80) is None
+    assert WeeklyTrendTemplate(ideal_df).failed_condition(rs_rating=60) == "rs"
+    assert WeeklyTrendTemplate(short_df).failed_condition(rs_rating=80) == "data"
+
+
+def test_weekly_template_rejects_nan_rs_rating(ideal_df):
+    """RSレーティングが NaN の場合は不合格になることを確認。"""
+    assert WeeklyTrendTemplate(ideal_df).passes(rs_rating=float("nan")) is False
+
+
+def test_weekly_template_uses_52_week_window():
+    """
+    52週高値・安値は直近52週だけで計算し、それより前の高値は判定に影響しないことを確認。
+    scripts/debug_small_batch.py の不合格内訳は indicators / failed_condition を使うので、それも確認する。
+    """
+    # 理想データの直前 40 週に高値 400 を置く（インデックスは連続した金曜になる）
+    passing = create_passing_prices()
+    close = np.concatenate([np.full(40, 400.0), passing])
+
+    template = WeeklyTrendTemplate(to_weekly_df(close))
+    assert template.indicators.high_52w == passing[-52:].max()
+    assert template.indicators.low_52w == passing[-52:].min()
+    assert template.failed_condition(rs_rating=80) is None
+    assert template.passes(rs_rating=80) is True
+
+
+# ───────── 不合格条件ごとのデータ加工 ─────────
+# 各ハンドラは (終値配列, 加工パラメータ) を受け取り、(終値配列, RSレーティング) を返す
+PASSING_RS = 80  # デフォルトで合格するRSレーティング
+
+
+def _low_rs(close, m):
+    return close, m["rs_rating"]
+
+
+def _price_below_ma(close, m):
+    # 最新の株価を10週MAより下に設定
+    close[-1] = IDEAL_MA10_LAST * m["price_factor"]
+    return close, PASSING_RS
+
+
+def _ma_cross(close, m):
+    # 短期MAが長期MAを下回るように、一時的な価格の落ち込みを発生させる
+    close[-m["dip_weeks"]:] *= m["dip_factor"]
+    return close, PASSING_RS
+
+
+def _ma40_slope(close, m):
+    # 40週MAの上昇を止める: 直近 3 週で窓から外れる週（-43〜-41 週）の終値を最新値より上に置き、
+    # 新たに入る終値が外れる終値を下回るようにする（10/30/40週MAの窓の外なので MA の順序は崩れない）
+    close[-43:-40] = close[-1] * m["peak_factor"]
+    return close, PASSING_RS
+
+
+def _low_pct_from_low(close, m):
+    # 52週安値からの上昇率が低いデータを作成
+    return create_passing_prices(start_val=m["start_val"], end_val=m["end_val"]), PASSING_RS
+
+
+def _high_pct_from_high(close, m):
+    # 52週高値から大きく下落したデータを作成
+    close[-1] *= m["price_dip_factor"]
+    return close, PASSING_RS
+
+
+FAILURE_HANDLERS = {
+    "low_rs": _low_rs,
+    "price_below_ma": _price_below_ma,
+    "ma_cross": _ma_cross,
+    "ma40_slope": _ma40_slope,
+    "low_pct_from_low": _low_pct_from_low,
+    "high_pct_from_high": _high_pct_from_high,
+}
+
+
 @pytest.mark.parametrize(
     "condition_to_fail, modification",
     [
         ("low_rs", {"rs_rating": 60}),
         ("price_below_ma", {"price_factor": 0.9}),
         ("ma_cross", {"dip_weeks": 20, "dip_factor": 0.7}),
-        ("ma40_slope", {"stagnant_weeks": 5}),
+        ("ma40_slope", {"peak_factor": 1.05}),
         ("low_pct_from_low", {"start_val": 180, "end_val": 200}),
         ("high_pct_from_high", {"price_dip_factor": 0.7}),
     ],
@@ -53,34 +178,14 @@ def test_weekly_template_fails_on_insufficient_data():
 )
 def test_weekly_template_failure_conditions(condition_to_fail, modification):
     """テンプレートが不合格になるべき様々な条件をテストする。"""
-    df_weekly = create_passing_df()
-    rs_rating = 80  # デフォルトで合格するRSレーティング
-
-    if condition_to_fail == "low_rs":
-        rs_rating = modification["rs_rating"]
-
-    elif condition_to_fail == "price_below_ma":
-        # 最新の株価を10週MAより下に設定
-        template = WeeklyTrendTemplate(df_weekly.copy())
-        ma10_val = template.ma10.iloc[-1]
-        df_weekly.iloc[-1, df_weekly.columns.get_loc("Close")] = ma10_val * modification["price_factor"]
-
-    elif condition_to_fail == "ma_cross":
-        # 短期MAが長期MAを下回るように、一時的な価格の落ち込みを発生させる
-        df_weekly.iloc[-modification["dip_weeks"]:, df_weekly.columns.get_loc("Close")] *= modification["dip_factor"]
-
-    elif condition_to_fail == "ma40_slope":
-        # 40週MAの上昇を止めるために、数週間の価格を停滞させる
-        last_val = df_weekly["Close"].iloc[-(modification["stagnant_weeks"] + 1)]
-        df_weekly.iloc[-modification["stagnant_weeks"]:, df_weekly.columns.get_loc("Close")] = last_val
-
-    elif condition_to_fail == "low_pct_from_low":
-        # 52週安値からの上昇率が低いデータを作成
-        df_weekly = create_passing_df(start_val=modification["start_val"], end_val=modification["end_val"])
+    close, rs_rating = FAILURE_HANDLERS[condition_to_fail](create_passing_prices(), modification)
+    template = WeeklyTrendTemplate(to_weekly_df(close))
+    assert template.passes(rs_rating=rs_rating) is False
 
-    elif condition_to_fail == "high_pct_from_high":
-        # 52週高値から大きく下落したデータを作成
-        df_weekly.iloc[-1, df_weekly.columns.get_loc("Close")] *= modification["price_dip_factor"]
 
-    template = WeeklyTrendTemplate(df_weekly)
-    assert template.passes(rs_rating=rs_rating) is False
+def test_weekly_template_ma40_slope_fixture_turns_ma40_down():
+    """ma40_slope 用の加工データで 40週MA が実際に上昇していないことを確認。"""
+    close, rs_rating = _ma40_slope(create_passing_prices(), {"peak_factor": 1.05})
+    template = WeeklyTrendTemplate(to_weekly_df(close))
+    assert template.indicators.ma40 <= template.indicators.ma40_prev
+    assert template.failed_condition(rs_rating=rs_rating) == "ma40_slope"